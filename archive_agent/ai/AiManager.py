@@ -197,6 +197,27 @@ class AiManager(RetryManager):
 
         raise RuntimeError(f"Failed to embed after {AiManager.EMBED_TRUNCATION_ATTEMPTS} truncation attempts")
 
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed several texts, sending the cache misses to the AI provider in one request.
+        NOTE: Transient errors are retried; there is no truncation, so if the batch is rejected (e.g. one text exceeds
+              the context length), embed the texts one by one via `embed()`.
+        :param texts: Texts.
+        :return: Embedding vectors (same order as texts).
+        :raises AiProviderBatchRejectedError: If the provider rejects the batch as invalid.
+        :raises typer.Exit: If all retries are exhausted.
+        """
+        callback = lambda: self.ai_provider.embed_batch_callback(texts)
+
+        results: List[AiResult] = self.cli.format_ai_embed_batch(callback=lambda: self.retry(callback), texts=texts)
+        self.ai_usage_stats['embed'] += sum(result.total_tokens for result in results)
+
+        vectors: List[List[float]] = []
+        for result in results:
+            assert result.embedding is not None
+            vectors.append(result.embedding)
+        return vectors
+
     def rerank(self, question: str, indexed_chunks: Dict[int, str]) -> RerankSchema:
         """
         Get reranked chunks based on relevance to question.
@@ -204,7 +225,8 @@ class AiManager(RetryManager):
         :param indexed_chunks: Indexed chunks.
         :return: RerankSchema.
         """
-        indexed_chunks_json_text = json.dumps(indexed_chunks, ensure_ascii=False, indent=2)
+        # Compact separators: indentation whitespace would only cost prompt tokens
+        indexed_chunks_json_text = json.dumps(indexed_chunks, ensure_ascii=False, separators=(',', ':'))
         prompt = AiRerank.get_prompt_rerank(question=question, indexed_chunks_json_text=indexed_chunks_json_text)
         callback = lambda: self.ai_provider.rerank_callback(prompt=prompt)
 
@@ -278,7 +300,7 @@ class AiManager(RetryManager):
         :param points: Points.
         :return: QuerySchema.
         """
-        context = AiQuery.get_context_from_points(points)
+        context, points_by_hash = AiQuery.index_points(points)
         prompt = AiQuery.get_prompt_query(question=question, context=context)
         callback = lambda: self.ai_provider.query_callback(prompt=prompt)
 
@@ -286,7 +308,7 @@ class AiManager(RetryManager):
         self.ai_usage_stats['query'] += result.total_tokens
         assert result.parsed_schema is not None
         query_result = cast(QuerySchema, result.parsed_schema)
-        query_result = AiQuery.format_query_references(logger=self.cli.logger, query_result=query_result, points=points)
+        query_result = AiQuery.format_query_references(logger=self.cli.logger, query_result=query_result, points_by_hash=points_by_hash)
 
         if query_result.is_rejected:
             self.ai_provider.invalidate_last_cached()
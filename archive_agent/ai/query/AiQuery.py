@@ -4,13 +4,13 @@
 
 import hashlib
 from logging import Logger
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from pydantic import BaseModel, ConfigDict
 from qdrant_client.http.models import ScoredPoint
 
 from archive_agent.util.format import get_point_reference_info
-from archive_agent.db.QdrantSchema import parse_payload
+from archive_agent.db.QdrantSchema import QdrantPayload, parse_payload
 
 
 # === Reference repair configuration (module-level) ===
@@ -22,6 +22,66 @@ HASH_REPAIR_MAX_DIST: int = 2
 _HEX_CHARS: str = "0123456789abcdef"
 
 
+# Static query instructions. Keep this prefix byte-stable and ahead of all volatile content (context, question):
+# provider-side prompt caches only hit on identical leading tokens.
+_QUERY_PROMPT_PREFIX: str = (
+    "Act as a query agent for a semantic retrieval system (RAG).\n"
+    "Your task is to answer the question using only the provided context as source of truth.\n"
+    "Adapt your response to suit any use case: factual lookups, analysis, or technical deep-dives.\n"
+    "Use a neutral, encyclopedic tone like Wikipedia—precise, structured, and comprehensive—\n"
+    "while being engaging and helpful like ChatGPT: conversational, practical, and user-focused.\n"
+    "You must output structured information using the exact response fields described below.\n"
+    "Do not return any explanations, commentary, or additional fields.\n"
+    "\n"
+    "RESPONSE STRATEGY (APPLIES TO ALL FIELDS):\n"
+    "- Prefer multi-chunk synthesis over single-chunk paraphrase.\n"
+    "- Connect dots across the 8 provided dossiers; favor depth and logical density.\n"
+    "- Target 6–8 dense `answer_list` items. Quality and technical precision over quantity.\n"
+    "- Use more references: for each answer, include 2–4 chunk references if available.\n"
+    "- Ensure every 16-character hex hash is copied exactly byte-for-byte.\n"
+    "\n"
+    "RESPONSE FIELDS:\n"
+    "\n"
+    "- `question_rephrased`:\n"
+    "    Rephrase the original question in clear, context-aware language.\n"
+    "\n"
+    "- `answer_list`:\n"
+    "    A list of objects, each containing a detailed, self-contained answer and its references.\n"
+    "    - `answer`:\n"
+    "        A detailed, narrative answer based solely on the context.\n"
+    "        Explain thoroughly with examples, steps, or physical implications.\n"
+    "        Use light Markdown (**bold**, *italic*), but no headings.\n"
+    "        Each answer must be \"flat\" (no internal bullet points or hierarchy).\n"
+    "        Integrate all content narratively. Avoid starting with bolded titles.\n"
+    "        Optional: append one short sentence labeled \"Speculative — What if: ...\".\n"
+    "        DO NOT mention references or provenance in this text field.\n"
+    "    - `chunk_ref_list`:\n"
+    "        List of reference designators: `<<< 0123456789ABCDEF >>>`.\n"
+    "        Accuracy is mission-critical: exactly 16 hex characters required.\n"
+    "\n"
+    "- `answer_conclusion`:\n"
+    "    A concise, integrative summary synthesizing the main ideas from `answer_list`.\n"
+    "    Highlight connections and key takeaways. No new information.\n"
+    "\n"
+    "- `follow_up_questions_list`:\n"
+    "    A list of 4–6 specific, well-formed follow-up questions that extend the topic.\n"
+    "    Each must be self-contained and include all required context.\n"
+    "\n"
+    "- `is_rejected`:\n"
+    "    Boolean flag. Set `true` ONLY if the context has zero relevant information.\n"
+    "\n"
+    "- `rejection_reason`:\n"
+    "    Short factual reason for rejection. Required only if `is_rejected` is `true`.\n"
+    "\n"
+    "IMPORTANT GLOBAL CONSTRAINTS:\n"
+    "- NO references or chunks mentioned in `answer` or `answer_conclusion` text.\n"
+    "- References ONLY go into the `chunk_ref_list` in each `answer_list` item.\n"
+    "- Accuracy check: verify that every hash in the output is exactly 16 characters.\n"
+    "- Speed & Intelligence: provide the most impactful insights from the context.\n"
+    "\n"
+)
+
+
 class AnswerItem(BaseModel):
     answer: str
     chunk_ref_list: List[str]
@@ -46,73 +106,15 @@ class AiQuery:
 
     @staticmethod
     def get_prompt_query(question: str, context: str) -> str:
-        return "\n".join([
-            "Act as a query agent for a semantic retrieval system (RAG).",
-            "Your task is to answer the question using only the provided context as source of truth.",
-            "Adapt your response to suit any use case: factual lookups, analysis, or technical deep-dives.",
-            "Use a neutral, encyclopedic tone like Wikipedia—precise, structured, and comprehensive—",
-            "while being engaging and helpful like ChatGPT: conversational, practical, and user-focused.",
-            "You must output structured information using the exact response fields described below.",
-            "Do not return any explanations, commentary, or additional fields.",
-            "",
-            "RESPONSE STRATEGY (APPLIES TO ALL FIELDS):",
-            "- Prefer multi-chunk synthesis over single-chunk paraphrase.",
-            "- Connect dots across the 8 provided dossiers; favor depth and logical density.",
-            "- Target 6–8 dense `answer_list` items. Quality and technical precision over quantity.",
-            "- Use more references: for each answer, include 2–4 chunk references if available.",
-            "- Ensure every 16-character hex hash is copied exactly byte-for-byte.",
-            "",
-            "RESPONSE FIELDS:",
-            "",
-            "- `question_rephrased`:",
-            "    Rephrase the original question in clear, context-aware language.",
-            "",
-            "- `answer_list`:",
-            "    A list of objects, each containing a detailed, self-contained answer and its references.",
-            "    - `answer`:",
-            "        A detailed, narrative answer based solely on the context.",
-            "        Explain thoroughly with examples, steps, or physical implications.",
-            "        Use light Markdown (**bold**, *italic*), but no headings.",
-            "        Each answer must be \"flat\" (no internal bullet points or hierarchy).",
-            "        Integrate all content narratively. Avoid starting with bolded titles.",
-            "        Optional: append one short sentence labeled \"Speculative — What if: ...\".",
-            "        DO NOT mention references or provenance in this text field.",
-            "    - `chunk_ref_list`:",
-            "        List of reference designators: `<<< 0123456789ABCDEF >>>`.",
-            "        Accuracy is mission-critical: exactly 16 hex characters required.",
-            "",
-            "- `answer_conclusion`:",
-            "    A concise, integrative summary synthesizing the main ideas from `answer_list`.",
-            "    Highlight connections and key takeaways. No new information.",
-            "",
-            "- `follow_up_questions_list`:",
-            "    A list of 4–6 specific, well-formed follow-up questions that extend the topic.",
-            "    Each must be self-contained and include all required context.",
-            "",
-            "- `is_rejected`:",
-            "    Boolean flag. Set `true` ONLY if the context has zero relevant information.",
-            "",
-            "- `rejection_reason`:",
-            "    Short factual reason for rejection. Required only if `is_rejected` is `true`.",
-            "",
-            "IMPORTANT GLOBAL CONSTRAINTS:",
-            "- NO references or chunks mentioned in `answer` or `answer_conclusion` text.",
-            "- References ONLY go into the `chunk_ref_list` in each `answer_list` item.",
-            "- Accuracy check: verify that every hash in the output is exactly 16 characters.",
-            "- Speed & Intelligence: provide the most impactful insights from the context.",
-            "",
-            "Context:\n\"\"\"\n" + context + "\n\"\"\"\n\n",
-            "Question:\n\"\"\"\n" + question + "\n\"\"\"",
-        ])
+        return f"{_QUERY_PROMPT_PREFIX}Context:\n\"\"\"\n{context}\n\"\"\"\n\n\nQuestion:\n\"\"\"\n{question}\n\"\"\""
 
     @staticmethod
-    def get_point_hash(point: ScoredPoint) -> str:
+    def get_payload_hash(model: QdrantPayload) -> str:
         """
-        Get point hash.
-        :param point: Point.
+        Get point hash from an already parsed payload.
+        :param model: Parsed payload.
         :return: Point hash (16-character hex, SHA-1).
         """
-        model = parse_payload(point.payload)
         chunk_index = str(model.chunk_index)
         chunks_total = str(model.chunks_total)
         file_path = str(model.file_path)
@@ -132,6 +134,32 @@ class AiQuery:
         # noinspection PyTypeChecker
         return hashlib.sha1(point_str.encode('utf-8')).hexdigest()[:16]
 
+    @staticmethod
+    def get_point_hash(point: ScoredPoint) -> str:
+        """
+        Get point hash.
+        :param point: Point.
+        :return: Point hash (16-character hex, SHA-1).
+        """
+        return AiQuery.get_payload_hash(parse_payload(point.payload))
+
+    @staticmethod
+    def index_points(points: List[ScoredPoint]) -> Tuple[str, Dict[str, ScoredPoint]]:
+        """
+        Get context and hash mapping from points in a single pass (each payload is parsed once).
+        :param points: Points.
+        :return: Tuple (context string, mapping of lowercase point hash to point).
+        """
+        context_parts: List[str] = []
+        points_by_hash: Dict[str, ScoredPoint] = {}
+        for point in points:
+            model = parse_payload(point.payload)
+            point_hash = AiQuery.get_payload_hash(model)  # SHA-1 hex digest is already lowercase
+            points_by_hash[point_hash] = point
+            context_parts.append(f"<<< {point_hash} >>>\n\n{model.chunk_text}\n")
+
+        return "\n\n\n\n".join(context_parts), points_by_hash
+
     @staticmethod
     def get_context_from_points(points: List[ScoredPoint]) -> str:
         """
@@ -139,19 +167,14 @@ class AiQuery:
         :param points: Points.
         :return: Context string.
         """
-        return "\n\n\n\n".join([
-            "\n\n".join([
-                f"<<< {AiQuery.get_point_hash(point)} >>>",
-                f"{parse_payload(point.payload).chunk_text}\n",
-            ])
-            for point in points
-        ])
+        context, _ = AiQuery.index_points(points)
+        return context
 
     @staticmethod
     def format_query_references(
             logger: Logger,
             query_result: QuerySchema,
-            points: List[ScoredPoint],
+            points_by_hash: Dict[str, ScoredPoint],
     ) -> QuerySchema:
         """
         Format reference designators in query result as human-readable reference infos.
@@ -161,17 +184,10 @@ class AiQuery:
         radius) are attempted when enabled.
         :param logger: Logger.
         :param query_result: Query result.
-        :param points: Points.
+        :param points_by_hash: Mapping of lowercase point hash to point (see `index_points`).
         :return: Query result with reference designators formatted as human-readable
                  reference infos; invalid references removed.
         """
-        # Build a mapping: hash -> ScoredPoint  (store keys lowercase for robustness)
-        points_by_hash = {
-            AiQuery.get_point_hash(point).lower(): point
-            for point in points
-            if point.payload is not None
-        }
-
         # Extracts 16-char token from '<<< 0123456789ABCDEF >>>'
         def extract_hash(ref: str) -> str:
             # Let's allow some slack from weaker or overloaded LLMs here...
@@ -194,11 +210,11 @@ class AiQuery:
             Attempt to repair a corrupted 16-char hash by nearest-neighbor search
             in Hamming space over known point hashes.
 
-            :param maybe_hash: The (possibly corrupted) 16-char token extracted from the reference.
+            :param maybe_hash: The (possibly corrupted) 16-char token extracted from the reference (already lowercase).
             :param max_dist: Maximum Hamming distance allowed for a repair to be accepted.
             :return: Repaired lowercase hash if confidently matched; otherwise None.
             """
-            token = (maybe_hash or "").lower()
+            token = maybe_hash
             if len(token) != 16:
                 return None
 
@@ -228,8 +244,8 @@ class AiQuery:
             # Build a new list to **discard** broken references instead of emitting '???'.
             formatted_refs: List[str] = []
             for chunk_ref in answer.chunk_ref_list:
-                hash_id = extract_hash(chunk_ref)
-                point = points_by_hash.get(hash_id.lower())
+                hash_id = extract_hash(chunk_ref)  # Already lowercase
+                point = points_by_hash.get(hash_id)
                 if point is not None:
                     formatted_refs.append(
                         get_point_reference_info(logger, point, verbose=False)
@@ -6,6 +6,53 @@ from typing import List, Tuple
 from pydantic import BaseModel, ConfigDict
 
 
+# Static rerank instructions, built once at import; only the chunks and the question vary per call.
+# Keep byte-stable so that provider-side prompt caching can reuse the prefix across queries.
+_RERANK_PROMPT_PREFIX: str = (
+    "Act as a reranking agent for a semantic retrieval system (Retrieval-Augmented Generation / RAG).\n"
+    "Your task is to assess the semantic relevance of each chunk to the question.\n"
+    "You are given a list of text chunks as a JSON array, where each array index corresponds to the chunk index.\n"
+    "You must output a JSON object with the exact fields described below.\n"
+    "Do not return any explanations, commentary, or additional fields. Output only the JSON.\n"
+    "\n"
+    "RESPONSE FIELDS:\n"
+    "\n"
+    "- `reranked_indices`:\n"
+    "    A list of integer indices.\n"
+    "    If `is_rejected` is false, this list MUST include ALL indices from 0 to (number of chunks - 1) exactly once,\n"
+    "    sorted by descending relevance (most relevant first).\n"
+    "    Do not omit any indices; include even low-relevance ones at the end. Omitting indices will cause errors.\n"
+    "    If `is_rejected` is true, this must be an empty list [].\n"
+    "\n"
+    "- `is_rejected`:\n"
+    "    A Boolean flag. Set to true ONLY if NONE of the chunks contain ANY relevant information to the question\n"
+    "    (e.g., all chunks are completely unrelated to the question's topic, or the list is empty).\n"
+    "    A chunk is relevant if it provides any information that directly helps answer the question or offers useful context.\n"
+    "    If at least one chunk has any degree of relevance (even partial),\n"
+    "    set to false and include ALL indices in reranked_indices, sorted by relevance.\n"
+    "\n"
+    "- `rejection_reason`:\n"
+    "    A short, factual reason for rejection.\n"
+    "    Include this ONLY if `is_rejected` is true. If `is_rejected` is false, set to empty string ''.\n"
+    "    Examples: 'All chunks are entirely unrelated to the question', 'Chunk list is empty',\n"
+    "    'No relevant content in any chunk'.\n"
+    "\n"
+    "RERANKING RULES:\n"
+    "- Consider only the provided chunk texts and the question.\n"
+    "- Assess semantic relevance, not superficial similarity. Relevance means the chunk helps in answering the question.\n"
+    "- If several chunks are equally relevant, preserve their original order.\n"
+    "- IMPORTANT: Never return a partial list of indices when is_rejected is false. Always include all or none.\n"
+    "\n"
+    "EXAMPLE 1 (no relevant chunks):\n"
+    "{\"reranked_indices\": [], \"is_rejected\": true, \"rejection_reason\": \"All chunks are unrelated to the question\"}\n"
+    "\n"
+    "EXAMPLE 2 (some relevant chunks):\n"
+    "{\"reranked_indices\": [2, 0, 1], \"is_rejected\": false, \"rejection_reason\": \"\"}\n"
+    "\n"
+    "Chunks (JSON array):\n"
+)
+
+
 class RerankSchema(BaseModel):
     reranked_indices: List[int]
     is_rejected: bool
@@ -20,51 +67,7 @@ class AiRerank:
 
     @staticmethod
     def get_prompt_rerank(question: str, indexed_chunks_json_text: str) -> str:
-        return "\n".join([
-            "Act as a reranking agent for a semantic retrieval system (Retrieval-Augmented Generation / RAG).",
-            "Your task is to assess the semantic relevance of each chunk to the question.",
-            "You are given a list of text chunks as a JSON array, where each array index corresponds to the chunk index.",
-            "You must output a JSON object with the exact fields described below.",
-            "Do not return any explanations, commentary, or additional fields. Output only the JSON.",
-            "",
-            "RESPONSE FIELDS:",
-            "",
-            "- `reranked_indices`:",
-            "    A list of integer indices.",
-            "    If `is_rejected` is false, this list MUST include ALL indices from 0 to (number of chunks - 1) exactly once,",
-            "    sorted by descending relevance (most relevant first).",
-            "    Do not omit any indices; include even low-relevance ones at the end. Omitting indices will cause errors.",
-            "    If `is_rejected` is true, this must be an empty list [].",
-            "",
-            "- `is_rejected`:",
-            "    A Boolean flag. Set to true ONLY if NONE of the chunks contain ANY relevant information to the question",
-            "    (e.g., all chunks are completely unrelated to the question's topic, or the list is empty).",
-            "    A chunk is relevant if it provides any information that directly helps answer the question or offers useful context.",
-            "    If at least one chunk has any degree of relevance (even partial),",
-            "    set to false and include ALL indices in reranked_indices, sorted by relevance.",
-            "",
-            "- `rejection_reason`:",
-            "    A short, factual reason for rejection.",
-            "    Include this ONLY if `is_rejected` is true. If `is_rejected` is false, set to empty string ''.",
-            "    Examples: 'All chunks are entirely unrelated to the question', 'Chunk list is empty',",
-            "    'No relevant content in any chunk'.",
-            "",
-            "RERANKING RULES:",
-            "- Consider only the provided chunk texts and the question.",
-            "- Assess semantic relevance, not superficial similarity. Relevance means the chunk helps in answering the question.",
-            "- If several chunks are equally relevant, preserve their original order.",
-            "- IMPORTANT: Never return a partial list of indices when is_rejected is false. Always include all or none.",
-            "",
-            "EXAMPLE 1 (no relevant chunks):",
-            "{\"reranked_indices\": [], \"is_rejected\": true, \"rejection_reason\": \"All chunks are unrelated to the question\"}",
-            "",
-            "EXAMPLE 2 (some relevant chunks):",
-            "{\"reranked_indices\": [2, 0, 1], \"is_rejected\": false, \"rejection_reason\": \"\"}",
-            "",
-            "Chunks (JSON array):\n" + indexed_chunks_json_text,
-            "",
-            "Question:\n\"\"\"\n" + question + "\n\"\"\"",
-        ])
+        return f"{_RERANK_PROMPT_PREFIX}{indexed_chunks_json_text}\n\nQuestion:\n\"\"\"\n{question}\n\"\"\""
 
     @staticmethod
     def validate_permutation(original: List[int], reranked: List[int]) -> Tuple[bool, List[int], List[int], List[int]]:
@@ -6,6 +6,17 @@ from typing import List
 from pydantic import BaseModel, ConfigDict, field_validator
 
 
+def _strip_newlines(v: str) -> str:
+    """
+    Join lines with single spaces and strip, to ensure single-line output.
+    :param v: Field value.
+    :return: Single-line value.
+    """
+    if v.isprintable():  # Every line boundary recognized by `splitlines` is non-printable
+        return v.strip()
+    return ' '.join(v.splitlines()).strip()
+
+
 class Entity(BaseModel):
     name: str
     description: str
@@ -16,7 +27,7 @@ class Entity(BaseModel):
     @classmethod
     def strip_newlines(cls, v: str) -> str:
         """Strip newlines from entity fields to ensure single-line output."""
-        return ' '.join(v.splitlines()).strip()
+        return _strip_newlines(v)
 
 
 class Relation(BaseModel):
@@ -30,7 +41,7 @@ class Relation(BaseModel):
     @classmethod
     def strip_newlines(cls, v: str) -> str:
         """Strip newlines from relation fields to ensure single-line output."""
-        return ' '.join(v.splitlines()).strip()
+        return _strip_newlines(v)
 
 
 class VisionSchema(BaseModel):
@@ -48,4 +59,4 @@ class VisionSchema(BaseModel):
     @classmethod
     def strip_newlines(cls, v: str) -> str:
         """Strip newlines from answer field to ensure single-line output."""
-        return ' '.join(v.splitlines()).strip()
+        return _strip_newlines(v)
@@ -1,20 +1,35 @@
 #  Copyright © 2025 Dr.-Ing. Paul Wilhelm <paul@wilhelm.dev>
 #  This file is part of Archive Agent. See LICENSE for details.
 
+import dataclasses
+import functools
 import json
 import hashlib
 import re
+import threading
 import time
+import traceback
 from logging import Logger
 from abc import ABC, abstractmethod
-from typing import Callable, Optional, cast
+from typing import Any, Callable, ClassVar, Dict, List, Optional, Type, TypeVar, cast
+
+import httpx
+from openai import BadRequestError, DefaultHttpxClient, OpenAI
+from pydantic import BaseModel
 
 from archive_agent.ai.AiResult import AiResult
 from archive_agent.core.CacheManager import CacheManager
 
+from archive_agent.ai_provider.AiProviderError import AiProviderError, AiProviderBatchRejectedError
 from archive_agent.ai_provider.AiProviderParams import AiProviderParams
 
 
+# Strings made only of these characters serialize to JSON verbatim (between quotes), so they can be hashed without `json.dumps`.
+_BASE64_PATTERN: re.Pattern = re.compile(r'[A-Za-z0-9+/=]*')
+
+_SchemaT = TypeVar('_SchemaT', bound=BaseModel)
+
+
 class AiProvider(ABC):
     """
     AI provider.
@@ -22,6 +37,16 @@ class AiProvider(ABC):
 
     AI_REQUEST_TIMEOUT_S = 120
 
+    # Whether `_perform_embed_batch_callback` sends all texts in one request (overridden by providers with a batch endpoint)
+    SUPPORTS_EMBED_BATCH = False
+
+    # Cache keys of requests currently in flight, shared by all provider instances (one per worker thread)
+    _inflight: ClassVar[Dict[str, threading.Event]] = {}
+    _inflight_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    _shared_http_client: ClassVar[Optional[httpx.Client]] = None
+    _shared_http_client_lock: ClassVar[threading.Lock] = threading.Lock()
+
     def __init__(
             self,
             logger: Logger,
@@ -51,6 +76,45 @@ class AiProvider(ABC):
 
         self._last_cache_key: Optional[str] = None
 
+        # Constant tail of every hashed cache key string (see `_get_cache_key`)
+        self._cache_key_suffix: bytes = f"}}:{self.params.get_static_cache_key()}".encode('utf-8')
+
+    @staticmethod
+    def get_shared_http_client() -> httpx.Client:
+        """
+        Get the process-wide pooled HTTP client for OpenAI SDK clients.
+        Provider instances are short-lived (a new one per worker task), so giving each its own HTTP client
+        would open a fresh connection (including the TLS handshake for remote servers) for almost every request.
+        :return: HTTP client (thread-safe, shared).
+        """
+        with AiProvider._shared_http_client_lock:
+            if AiProvider._shared_http_client is None:
+                AiProvider._shared_http_client = DefaultHttpxClient()  # SDK defaults for limits and redirects
+            return AiProvider._shared_http_client
+
+    @staticmethod
+    @functools.cache
+    def get_json_schema(schema: Type[BaseModel]) -> Dict[str, Any]:
+        """
+        Get JSON schema of a response schema, generated once per schema class.
+        NOTE: The returned dict is shared; do not modify it.
+        :param schema: Response schema class.
+        :return: JSON schema.
+        """
+        return schema.model_json_schema()
+
+    @staticmethod
+    def _format_response(response: Any) -> str:
+        """
+        Format a raw SDK response for diagnostics.
+        Only call this on error paths; serializing the whole response is not free.
+        :param response: SDK response object.
+        :return: Indented JSON dump of the response.
+        """
+        if isinstance(response, BaseModel):
+            return response.model_dump_json(indent=2)
+        return json.dumps(response.__dict__, indent=2, default=str)
+
     @staticmethod
     def _sanitize_json(json_raw: str) -> str:
         """
@@ -62,6 +126,46 @@ class AiProvider(ABC):
         """
         return re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f]', '', json_raw)
 
+    @classmethod
+    def _parse_schema(cls, schema: Type[_SchemaT], json_raw: str, response: Any) -> _SchemaT:
+        """
+        Sanitize and validate a structured JSON response.
+        :param schema: Expected schema.
+        :param json_raw: Raw JSON string from AI response.
+        :param response: SDK response object, dumped into the error message only if validation fails.
+        :return: Parsed schema.
+        :raises AiProviderError: If the JSON does not validate against the schema.
+        """
+        try:
+            return schema.model_validate_json(cls._sanitize_json(json_raw))
+        except Exception as e:
+            raise AiProviderError(f"Invalid JSON:\n{json_raw}\n{e}\n{cls._format_response(response)}")
+
+    def _get_cache_key(self, cache_key_prefix: str, callback_kwargs: dict) -> str:
+        """
+        Get cache key for a request.
+        Hashes `{cache_key_prefix}:{json.dumps(callback_kwargs, sort_keys=True)}:{static cache key}` incrementally,
+        so large Base64 payloads (vision images) are fed to SHA-256 as-is instead of being copied into a JSON string.
+        The digest is identical to hashing the fully serialized string, keeping existing cache entries valid.
+        :param cache_key_prefix: Cache key prefix.
+        :param callback_kwargs: Keyword arguments for the callback.
+        :return: Cache key.
+        """
+        h = hashlib.sha256(f"{cache_key_prefix}:{{".encode('utf-8'))
+        for index, name in enumerate(sorted(callback_kwargs)):
+            value = callback_kwargs[name]
+            if index > 0:
+                h.update(b", ")
+            h.update(f"{json.dumps(name)}: ".encode('utf-8'))
+            if isinstance(value, str) and _BASE64_PATTERN.fullmatch(value):
+                h.update(b'"')
+                h.update(value.encode('ascii'))
+                h.update(b'"')
+            else:
+                h.update(json.dumps(value, sort_keys=True).encode('utf-8'))
+        h.update(self._cache_key_suffix)
+        return h.hexdigest()
+
     def _handle_cached_request(
             self,
             cache_key_prefix: str,
@@ -75,10 +179,7 @@ class AiProvider(ABC):
         :param callback_kwargs: Keyword arguments for the callback.
         :return: AI result.
         """
-        callback_kwargs_str = json.dumps(callback_kwargs, sort_keys=True)
-        params_str = self.params.get_static_cache_key()
-        cache_str = f"{cache_key_prefix}:{callback_kwargs_str}:{params_str}"
-        cache_key = hashlib.sha256(cache_str.encode('utf-8')).hexdigest()
+        cache_key = self._get_cache_key(cache_key_prefix=cache_key_prefix, callback_kwargs=callback_kwargs)
         self._last_cache_key = cache_key
 
         cached_result = self.cache.get(key=cache_key, display_key=cache_key_prefix)
@@ -87,13 +188,38 @@ class AiProvider(ABC):
             ai_result.total_tokens = 0  # Cached result consumed no tokens
             return ai_result
 
-        t0 = time.monotonic()
-        result: AiResult = callback(**callback_kwargs)
-        elapsed = time.monotonic() - t0
-        self.logger.info(f"API call '{cache_key_prefix}' completed in {elapsed:.1f}s")
+        # Single-flight: if another worker is already requesting the same key, wait for it and re-read the cache
+        # NOTE: Skipped with `--nocache`, where cache reads are bypassed and followers could never use the leader's result.
+        leader_event: Optional[threading.Event] = None
+        while not self.invalidate_cache:
+            with AiProvider._inflight_lock:
+                inflight_event = AiProvider._inflight.get(cache_key)
+                if inflight_event is None:
+                    leader_event = AiProvider._inflight[cache_key] = threading.Event()
+                    break
 
-        # Cache write.
-        self.cache[cache_key] = result
+            inflight_event.wait()
+            cached_result = self.cache.get(key=cache_key, display_key=cache_key_prefix)
+            if cached_result is not None:
+                ai_result = cast(AiResult, cached_result)
+                ai_result.total_tokens = 0  # Cached result consumed no tokens
+                return ai_result
+            # Otherwise, the other request failed (or its result was invalidated): compete for leadership again,
+            # so that only one of the waiting followers retries the request
+
+        try:
+            t0 = time.monotonic()
+            result: AiResult = callback(**callback_kwargs)
+            elapsed = time.monotonic() - t0
+            self.logger.info(f"API call '{cache_key_prefix}' completed in {elapsed:.1f}s")
+
+            # Cache write.
+            self.cache[cache_key] = result
+        finally:
+            if leader_event is not None:
+                with AiProvider._inflight_lock:
+                    del AiProvider._inflight[cache_key]
+                leader_event.set()
 
         return result
 
@@ -155,6 +281,92 @@ class AiProvider(ABC):
             callback_kwargs=dict(text=text),
         )
 
+    def _perform_embed_batch_callback(self, texts: List[str]) -> List[AiResult]:
+        """
+        Perform embed callback for several texts.
+        Providers with a native batch endpoint override this; by default, texts are embedded one by one.
+        :param texts: Texts.
+        :return: AI results (same order as texts).
+        :raises AiProviderError: On error.
+        """
+        return [self._perform_embed_callback(text=text) for text in texts]
+
+    def _perform_openai_embed_batch(self, client: OpenAI, texts: List[str]) -> List[AiResult]:
+        """
+        Embed several texts in one request via the embeddings endpoint of an OpenAI SDK client.
+        Shared by the providers built on the OpenAI SDK.
+        :param client: OpenAI SDK client.
+        :param texts: Texts.
+        :return: AI results (same order as texts).
+        :raises AiProviderError: On error.
+        :raises AiProviderBatchRejectedError: If the batch is rejected as invalid (e.g. one text exceeds the context length).
+        """
+        try:
+            response = client.embeddings.create(
+                input=texts,
+                model=self.params.model_embed,
+            )
+        except BadRequestError as e:
+            raise AiProviderBatchRejectedError(f"Batch embedding rejected ({len(texts)} texts): {e}")
+        except Exception as e:
+            tb = traceback.format_exc()
+            raise AiProviderError(
+                f"Batch embedding failed ({len(texts)} texts): {type(e).__name__}: {e}\n"
+                f"Traceback:\n{tb}"
+            )
+
+        embeddings = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        if len(embeddings) != len(texts):
+            raise AiProviderError(f"Batch embedding returned {len(embeddings)} embeddings for {len(texts)} texts")
+
+        # Token usage is reported per request; attribute it to the first result so that totals stay correct
+        total_tokens = response.usage.total_tokens if response.usage else 0
+        return [
+            AiResult(total_tokens=total_tokens if index == 0 else 0, embedding=embedding)
+            for index, embedding in enumerate(embeddings)
+        ]
+
+    def embed_batch_callback(self, texts: List[str]) -> List[AiResult]:
+        """
+        Embed callback for several texts with per-text caching.
+        Each text is cached under the same key as in `embed_callback`, so batched and single calls share cache entries.
+        Only the texts missing from the cache are sent to the provider, as one batch.
+        :param texts: Texts.
+        :return: AI results (same order as texts).
+        :raises AiProviderError: On error.
+        """
+        cache_keys = [self._get_cache_key(cache_key_prefix="embed_callback", callback_kwargs=dict(text=text)) for text in texts]
+
+        results: List[Optional[AiResult]] = []
+        missing: Dict[str, List[int]] = {}  # Cache key -> indices of texts (duplicate texts are embedded once)
+        for index, cache_key in enumerate(cache_keys):
+            cached_result = None if cache_key in missing else self.cache.get(key=cache_key, display_key="embed_callback")
+            if cached_result is not None:
+                ai_result: AiResult = cast(AiResult, cached_result)
+                ai_result.total_tokens = 0  # Cached result consumed no tokens
+                results.append(ai_result)
+            else:
+                results.append(None)
+                missing.setdefault(cache_key, []).append(index)
+
+        if missing:
+            t0 = time.monotonic()
+            missing_results = self._perform_embed_batch_callback(texts=[texts[indices[0]] for indices in missing.values()])
+            elapsed = time.monotonic() - t0
+            self.logger.info(f"API call 'embed_batch_callback' ({len(missing)} texts) completed in {elapsed:.1f}s")
+
+            if len(missing_results) != len(missing):
+                raise AiProviderError(f"Embedding batch returned {len(missing_results)} results for {len(missing)} texts")
+
+            for (cache_key, indices), result in zip(missing.items(), missing_results):
+                # Cache write.
+                self.cache[cache_key] = result
+                results[indices[0]] = result
+                for index in indices[1:]:
+                    results[index] = dataclasses.replace(result, total_tokens=0)  # Tokens are counted once
+
+        return cast(List[AiResult], results)
+
     @abstractmethod
     def _perform_rerank_callback(self, prompt: str) -> AiResult:
         """
@@ -15,3 +15,11 @@ class AiProviderMaxTokensError(Exception):
     Retrying with the same input will produce the same truncation.
     """
     pass
+
+
+class AiProviderBatchRejectedError(Exception):
+    """
+    AI provider error: batch request rejected as invalid, e.g. one input exceeds the context length (non-retryable).
+    Retrying the same batch will be rejected again; callers should fall back to per-item requests.
+    """
+    pass
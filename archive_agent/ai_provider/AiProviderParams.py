@@ -35,9 +35,18 @@ class AiProviderParams:
         self.model_vision = model_vision
         self.temperature_query = temperature_query
 
+        self._static_cache_key = self._compute_static_cache_key()
+
     def get_static_cache_key(self) -> str:
         """
-        Get static cache key.
+        Get static cache key (computed once on initialization; the parameters are not changed afterwards).
+        :return: Deterministic SHA-256 hash over AI provider parameters.
+        """
+        return self._static_cache_key
+
+    def _compute_static_cache_key(self) -> str:
+        """
+        Compute static cache key.
         :return: Deterministic SHA-256 hash over AI provider parameters.
         """
         params = {
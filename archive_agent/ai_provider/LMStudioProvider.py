@@ -4,6 +4,7 @@
 import json
 import traceback
 from logging import Logger
+from typing import List
 
 from openai import OpenAI
 
@@ -25,6 +26,8 @@ class LMStudioProvider(AiProvider):
     LM Studio provider with structured output and optional vision support.
     """
 
+    SUPPORTS_EMBED_BATCH = True
+
     def __init__(
             self,
             logger: Logger,
@@ -50,7 +53,12 @@ class LMStudioProvider(AiProvider):
             server_url=server_url,
         )
 
-        self.client = OpenAI(base_url=self.server_url, api_key="lm-studio", timeout=AiProvider.AI_REQUEST_TIMEOUT_S)
+        self.client = OpenAI(
+            base_url=self.server_url,
+            api_key="lm-studio",
+            timeout=AiProvider.AI_REQUEST_TIMEOUT_S,
+            http_client=AiProvider.get_shared_http_client(),
+        )
 
     def _perform_chunk_callback(self, prompt: str) -> AiResult:
         """
@@ -78,21 +86,16 @@ class LMStudioProvider(AiProvider):
                 "type": "json_schema",
                 "json_schema": {
                     "name": ChunkSchema.__name__,
-                    "schema": ChunkSchema.model_json_schema(),
+                    "schema": self.get_json_schema(ChunkSchema),
                     "strict": True,
                 },
             },
         )
 
-        formatted_response = json.dumps(response.__dict__, indent=2, default=str)
-
         json_raw = response.choices[0].message.content
         if json_raw is None:
-            raise AiProviderError(f"Missing JSON\n{formatted_response}")
-        try:
-            parsed_schema = ChunkSchema.model_validate_json(self._sanitize_json(json_raw))
-        except Exception as e:
-            raise AiProviderError(f"Invalid JSON:\n{json_raw}\n{e}\n{formatted_response}")
+            raise AiProviderError(f"Missing JSON\n{self._format_response(response)}")
+        parsed_schema = self._parse_schema(ChunkSchema, json_raw, response)
 
         return AiResult(
             total_tokens=response.usage.total_tokens if response.usage else 0,
@@ -127,6 +130,16 @@ class LMStudioProvider(AiProvider):
                 f"Traceback:\n{tb}"
             )
 
+    def _perform_embed_batch_callback(self, texts: List[str]) -> List[AiResult]:
+        """
+        Embed callback for several texts in one request.
+        :param texts: Texts.
+        :return: AI results (same order as texts).
+        :raises AiProviderError: On error.
+        :raises AiProviderBatchRejectedError: If the batch is rejected as invalid.
+        """
+        return self._perform_openai_embed_batch(client=self.client, texts=texts)
+
     def _perform_rerank_callback(self, prompt: str) -> AiResult:
         """
         Rerank callback.
@@ -153,21 +166,16 @@ class LMStudioProvider(AiProvider):
                 "type": "json_schema",
                 "json_schema": {
                     "name": RerankSchema.__name__,
-                    "schema": RerankSchema.model_json_schema(),
+                    "schema": self.get_json_schema(RerankSchema),
                     "strict": True,
                 },
             },
         )
 
-        formatted_response = json.dumps(response.__dict__, indent=2, default=str)
-
         json_raw = response.choices[0].message.content
         if json_raw is None:
-            raise AiProviderError(f"Missing JSON\n{formatted_response}")
-        try:
-            parsed_schema = RerankSchema.model_validate_json(self._sanitize_json(json_raw))
-        except Exception as e:
-            raise AiProviderError(f"Invalid JSON:\n{json_raw}\n{e}\n{formatted_response}")
+            raise AiProviderError(f"Missing JSON\n{self._format_response(response)}")
+        parsed_schema = self._parse_schema(RerankSchema, json_raw, response)
 
         return AiResult(
             total_tokens=response.usage.total_tokens if response.usage else 0,
@@ -201,21 +209,16 @@ class LMStudioProvider(AiProvider):
                 "type": "json_schema",
                 "json_schema": {
                     "name": QuerySchema.__name__,
-                    "schema": QuerySchema.model_json_schema(),
+                    "schema": self.get_json_schema(QuerySchema),
                     "strict": True,
                 },
             },
         )
 
-        formatted_response = json.dumps(response.__dict__, indent=2, default=str)
-
         json_raw = response.choices[0].message.content
         if json_raw is None:
-            raise AiProviderError(f"Missing JSON\n{formatted_response}")
-        try:
-            parsed_schema = QuerySchema.model_validate_json(self._sanitize_json(json_raw))
-        except Exception as e:
-            raise AiProviderError(f"Invalid JSON:\n{json_raw}\n{e}\n{formatted_response}")
+            raise AiProviderError(f"Missing JSON\n{self._format_response(response)}")
+        parsed_schema = self._parse_schema(QuerySchema, json_raw, response)
 
         return AiResult(
             total_tokens=response.usage.total_tokens if response.usage else 0,
@@ -259,21 +262,16 @@ class LMStudioProvider(AiProvider):
                 "type": "json_schema",
                 "json_schema": {
                     "name": VisionSchema.__name__,
-                    "schema": VisionSchema.model_json_schema(),
+                    "schema": self.get_json_schema(VisionSchema),
                     "strict": True,
                 },
             },
         )
 
-        formatted_response = json.dumps(response.__dict__, indent=2, default=str)
-
         json_raw = response.choices[0].message.content
         if json_raw is None:
-            raise AiProviderError(f"Missing JSON\n{formatted_response}")
-        try:
-            parsed_schema = VisionSchema.model_validate_json(self._sanitize_json(json_raw))
-        except Exception as e:
-            raise AiProviderError(f"Invalid JSON:\n{json_raw}\n{e}\n{formatted_response}")
+            raise AiProviderError(f"Missing JSON\n{self._format_response(response)}")
+        parsed_schema = self._parse_schema(VisionSchema, json_raw, response)
 
         return AiResult(
             total_tokens=response.usage.total_tokens if response.usage else 0,
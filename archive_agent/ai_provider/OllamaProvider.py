@@ -1,7 +1,6 @@
 #  Copyright © 2025 Dr.-Ing. Paul Wilhelm <paul@wilhelm.dev>
 #  This file is part of Archive Agent. See LICENSE for details.
 
-import json
 from logging import Logger
 
 from ollama import Client as OllamaClient
@@ -66,20 +65,15 @@ class OllamaProvider(AiProvider):
             options={
                 "temperature": 0.0,
             },
-            format=ChunkSchema.model_json_schema(),
+            format=self.get_json_schema(ChunkSchema),
         )
 
-        formatted_response = json.dumps(response, indent=2, default=str)
-
         json_raw = response["message"]["content"]
-        try:
-            parsed_schema = ChunkSchema.model_validate_json(self._sanitize_json(json_raw))
-        except Exception as e:
-            raise AiProviderError(f"Invalid JSON:\n{json_raw}\n{e}\n{formatted_response}")
+        parsed_schema = self._parse_schema(ChunkSchema, json_raw, response)
 
         return AiResult(
             total_tokens=response.get("eval_count", 0),
-            output_text=response["message"]["content"],
+            output_text=json_raw,
             parsed_schema=parsed_schema,
         )
 
@@ -115,20 +109,15 @@ class OllamaProvider(AiProvider):
             options={
                 "temperature": 0.0,
             },
-            format=RerankSchema.model_json_schema(),
+            format=self.get_json_schema(RerankSchema),
         )
 
-        formatted_response = json.dumps(response, indent=2, default=str)
-
         json_raw = response["message"]["content"]
-        try:
-            parsed_schema = RerankSchema.model_validate_json(self._sanitize_json(json_raw))
-        except Exception as e:
-            raise AiProviderError(f"Invalid JSON:\n{json_raw}\n{e}\n{formatted_response}")
+        parsed_schema = self._parse_schema(RerankSchema, json_raw, response)
 
         return AiResult(
             total_tokens=response.get("eval_count", 0),
-            output_text=response["message"]["content"],
+            output_text=json_raw,
             parsed_schema=parsed_schema,
         )
 
@@ -147,20 +136,15 @@ class OllamaProvider(AiProvider):
             options={
                 "temperature": self.params.temperature_query,
             },
-            format=QuerySchema.model_json_schema(),
+            format=self.get_json_schema(QuerySchema),
         )
 
-        formatted_response = json.dumps(response, indent=2, default=str)
-
         json_raw = response["message"]["content"]
-        try:
-            parsed_schema = QuerySchema.model_validate_json(self._sanitize_json(json_raw))
-        except Exception as e:
-            raise AiProviderError(f"Invalid JSON:\n{json_raw}\n{e}\n{formatted_response}")
+        parsed_schema = self._parse_schema(QuerySchema, json_raw, response)
 
         return AiResult(
             total_tokens=response.get("eval_count", 0),
-            output_text=response["message"]["content"],
+            output_text=json_raw,
             parsed_schema=parsed_schema,
         )
 
@@ -182,19 +166,14 @@ class OllamaProvider(AiProvider):
                 },
             ],
             options={},
-            format=VisionSchema.model_json_schema(),
+            format=self.get_json_schema(VisionSchema),
         )
 
-        formatted_response = json.dumps(response, indent=2, default=str)
-
         json_raw = response["message"]["content"]
-        try:
-            parsed_schema = VisionSchema.model_validate_json(self._sanitize_json(json_raw))
-        except Exception as e:
-            raise AiProviderError(f"Invalid JSON:\n{json_raw}\n{e}\n{formatted_response}")
+        parsed_schema = self._parse_schema(VisionSchema, json_raw, response)
 
         return AiResult(
             total_tokens=response.get("eval_count", 0),
-            output_text=response["message"]["content"],
+            output_text=json_raw,
             parsed_schema=parsed_schema,
         )
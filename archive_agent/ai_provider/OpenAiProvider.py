@@ -3,10 +3,9 @@
 
 import typer
 import os
-import json
 import traceback
 from logging import Logger
-from typing import Any, cast
+from typing import Any, List, cast
 
 from openai import OpenAI
 
@@ -58,8 +57,7 @@ def _extract_text_from_response(response: Any) -> str:
     if getattr(response, "output_text", None):
         return response.output_text
 
-    formatted_response = json.dumps(response.__dict__, indent=2, default=str)
-    raise AiProviderError(f"Missing JSON: Could not extract text from response\n{formatted_response}")
+    raise AiProviderError(f"Missing JSON: Could not extract text from response\n{AiProvider._format_response(response)}")
 
 
 class OpenAiProvider(AiProvider):
@@ -67,6 +65,8 @@ class OpenAiProvider(AiProvider):
     OpenAI provider.
     """
 
+    SUPPORTS_EMBED_BATCH = True
+
     def __init__(
             self,
             logger: Logger,
@@ -92,12 +92,17 @@ class OpenAiProvider(AiProvider):
             )
             raise typer.Exit(code=1)
 
-        self.client = OpenAI(base_url=self.server_url, timeout=AiProvider.AI_REQUEST_TIMEOUT_S)
+        self.client = OpenAI(
+            base_url=self.server_url,
+            timeout=AiProvider.AI_REQUEST_TIMEOUT_S,
+            http_client=AiProvider.get_shared_http_client(),
+        )
 
     def _responses_create(self, model: str, op: str, **kwargs: Any) -> Any:
         """
         Wrapper around client.responses.create that omits unsupported params
         for GPT-5 and applies hardcoded defaults for reasoning/verbosity.
+        Sets a per-operation prompt cache key for all models.
         """
         if model.startswith("gpt-5"):
             # Drop unsupported fields
@@ -123,6 +128,10 @@ class OpenAiProvider(AiProvider):
                 if "text" in kwargs and isinstance(kwargs["text"], dict):
                     kwargs["text"].setdefault("verbosity", GPT_5_VERBOSITY_RERANK)
 
+        # Route requests sharing the same static prompt prefix together, improving OpenAI prompt cache hits
+        # NOTE: Sent via `extra_body`, as older SDK releases (allowed by our dependency bounds) lack the `prompt_cache_key` parameter.
+        kwargs.setdefault("extra_body", {}).setdefault("prompt_cache_key", f"archive-agent-{op}")
+
         return self.client.responses.create(model=model, **kwargs)
 
     def _perform_chunk_callback(self, prompt: str) -> AiResult:
@@ -146,22 +155,17 @@ class OpenAiProvider(AiProvider):
                 "format": {
                     "type": "json_schema",
                     "name": ChunkSchema.__name__,
-                    "schema": ChunkSchema.model_json_schema(),
+                    "schema": self.get_json_schema(ChunkSchema),
                     "strict": True,
                 },
             },
         )
 
-        formatted_response = json.dumps(response.__dict__, indent=2, default=str)
-
         if getattr(response, 'refusal', None):
-            raise AiProviderError(f"Chunk refusal\n{formatted_response}")
+            raise AiProviderError(f"Chunk refusal\n{self._format_response(response)}")
 
         json_raw = _extract_text_from_response(response)
-        try:
-            parsed_schema = ChunkSchema.model_validate_json(self._sanitize_json(json_raw))
-        except Exception as e:
-            raise AiProviderError(f"Invalid JSON:\n{json_raw}\n{e}\n{formatted_response}")
+        parsed_schema = self._parse_schema(ChunkSchema, json_raw, response)
 
         return AiResult(
             total_tokens=response.usage.total_tokens if response.usage else 0,
@@ -188,6 +192,16 @@ class OpenAiProvider(AiProvider):
                 f"Traceback:\n{tb}"
             )
 
+    def _perform_embed_batch_callback(self, texts: List[str]) -> List[AiResult]:
+        """
+        Embed callback for several texts in one request.
+        :param texts: Texts.
+        :return: AI results (same order as texts).
+        :raises AiProviderError: On error.
+        :raises AiProviderBatchRejectedError: If the batch is rejected as invalid.
+        """
+        return self._perform_openai_embed_batch(client=self.client, texts=texts)
+
     def _perform_rerank_callback(self, prompt: str) -> AiResult:
         # noinspection PyTypeChecker
         response = self._responses_create(
@@ -209,22 +223,17 @@ class OpenAiProvider(AiProvider):
                 "format": {
                     "type": "json_schema",
                     "name": RerankSchema.__name__,
-                    "schema": RerankSchema.model_json_schema(),
+                    "schema": self.get_json_schema(RerankSchema),
                     "strict": True,
                 },
             },
         )
 
-        formatted_response = json.dumps(response.__dict__, indent=2, default=str)
-
         if getattr(response, 'refusal', None):
-            raise AiProviderError(f"Rerank refusal\n{formatted_response}")
+            raise AiProviderError(f"Rerank refusal\n{self._format_response(response)}")
 
         json_raw = _extract_text_from_response(response)
-        try:
-            parsed_schema = RerankSchema.model_validate_json(self._sanitize_json(json_raw))
-        except Exception as e:
-            raise AiProviderError(f"Invalid JSON:\n{json_raw}\n{e}\n{formatted_response}")
+        parsed_schema = self._parse_schema(RerankSchema, json_raw, response)
 
         return AiResult(
             total_tokens=response.usage.total_tokens if response.usage else 0,
@@ -253,22 +262,17 @@ class OpenAiProvider(AiProvider):
                 "format": {
                     "type": "json_schema",
                     "name": QuerySchema.__name__,
-                    "schema": QuerySchema.model_json_schema(),
+                    "schema": self.get_json_schema(QuerySchema),
                     "strict": True,
                 },
             },
         )
 
-        formatted_response = json.dumps(response.__dict__, indent=2, default=str)
-
         if getattr(response, 'refusal', None):
-            raise AiProviderError(f"Query refusal\n{formatted_response}")
+            raise AiProviderError(f"Query refusal\n{self._format_response(response)}")
 
         json_raw = _extract_text_from_response(response)
-        try:
-            parsed_schema = QuerySchema.model_validate_json(self._sanitize_json(json_raw))
-        except Exception as e:
-            raise AiProviderError(f"Invalid JSON:\n{json_raw}\n{e}\n{formatted_response}")
+        parsed_schema = self._parse_schema(QuerySchema, json_raw, response)
 
         return AiResult(
             total_tokens=response.usage.total_tokens if response.usage else 0,
@@ -300,20 +304,18 @@ class OpenAiProvider(AiProvider):
                 "format": {
                     "type": "json_schema",
                     "name": VisionSchema.__name__,
-                    "schema": VisionSchema.model_json_schema(),
+                    "schema": self.get_json_schema(VisionSchema),
                     "strict": True,
                 },
             },
         )
 
-        formatted_response = json.dumps(response.__dict__, indent=2, default=str)
-
         if response.status == 'incomplete':
             openai_incomplete_details = getattr(response, 'incomplete_details', None)
             if openai_incomplete_details is not None:
                 openai_incomplete_details_reason = getattr(openai_incomplete_details, 'reason', None)
                 if openai_incomplete_details_reason == 'content_filter':
-                    self.logger.critical(f"⚠️ Vision content filter triggered by OpenAI\n{formatted_response}")
+                    self.logger.critical(f"⚠️ Vision content filter triggered by OpenAI\n{self._format_response(response)}")
                     return AiResult(
                         total_tokens=response.usage.total_tokens if response.usage else 0,
                         output_text="",
@@ -325,11 +327,11 @@ class OpenAiProvider(AiProvider):
                             answer=""
                         )
                     )
-            raise AiProviderError(f"Vision response incomplete for unknown/unhandled reason\n{formatted_response}")
+            raise AiProviderError(f"Vision response incomplete for unknown/unhandled reason\n{self._format_response(response)}")
 
         openai_refusal = getattr(response, 'refusal', None)
         if openai_refusal is not None:
-            self.logger.critical(f"⚠️ Vision refusal triggered by OpenAI\n{formatted_response}")
+            self.logger.critical(f"⚠️ Vision refusal triggered by OpenAI\n{self._format_response(response)}")
             return AiResult(
                 total_tokens=response.usage.total_tokens if response.usage else 0,
                 output_text="",
@@ -343,10 +345,7 @@ class OpenAiProvider(AiProvider):
             )
 
         json_raw = _extract_text_from_response(response)
-        try:
-            parsed_schema = VisionSchema.model_validate_json(self._sanitize_json(json_raw))
-        except Exception as e:
-            raise AiProviderError(f"Invalid JSON:\n{json_raw}\n{e}\n{formatted_response}")
+        parsed_schema = self._parse_schema(VisionSchema, json_raw, response)
 
         return AiResult(
             total_tokens=response.usage.total_tokens if response.usage else 0,
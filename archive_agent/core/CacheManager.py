@@ -47,10 +47,11 @@ class CacheManager:
                 self.cli.logger.info(f"Cache read bypassed (--nocache) for '{display_key}'")
             return None
 
-        if key in self.cache:
+        value = self.cache.get(key)  # Single read; cached values are never `None`
+        if value is not None:
             if self.verbose:
                 self.cli.logger.info(f"Cache hit for '{display_key}'")
-            return self.cache[key]
+            return value
         else:
             if self.verbose:
                 self.cli.logger.info(f"Cache miss for '{display_key}'")
@@ -413,6 +413,32 @@ class CliManager:
 
         return result
 
+    def format_ai_embed_batch(
+            self,
+            callback: Callable[[], List[AiResult]],
+            texts: List[str],
+    ) -> List[AiResult]:
+        """
+        Format texts to be embedded in one batch.
+        :param callback: Embed batch callback returning AI results.
+        :param texts: Texts.
+        :return: AI results.
+        """
+        if CliManager.VERBOSE_EMBED:
+            for text in texts:
+                self.format_chunk(text)
+            self.logger.info(f"✨ Awaiting AI embedding of ({len(texts)}) chunks…")
+
+        results: List[AiResult] = callback()
+
+        total_tokens = sum(result.total_tokens for result in results)
+        self.update_ai_usage({"embed": total_tokens})
+
+        if CliManager.VERBOSE_USAGE:
+            self.logger.info(f"Used ({total_tokens}) AI API token(s) for embedding")
+
+        return results
+
     def format_ai_query(
             self,
             callback: Callable[[], AiResult],
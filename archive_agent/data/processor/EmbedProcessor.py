@@ -8,7 +8,7 @@ from typing import List, Any, Optional, Tuple
 
 import typer
 from archive_agent.ai.AiManagerFactory import AiManagerFactory
-from archive_agent.ai_provider.AiProviderError import AiProviderMaxTokensError
+from archive_agent.ai_provider.AiProviderError import AiProviderMaxTokensError, AiProviderBatchRejectedError
 from archive_agent.util.format import format_file
 from archive_agent.core.ProgressManager import ProgressInfo
 
@@ -16,8 +16,12 @@ from archive_agent.core.ProgressManager import ProgressInfo
 class EmbedProcessor:
     """
     Handles parallel processing of chunk embeddings.
+    If the AI provider has a native batch endpoint, chunks are embedded in batches (one provider request per batch),
+    and a rejected batch falls back to per-chunk embedding; otherwise, each chunk is embedded in its own task.
     """
 
+    BATCH_SIZE = 32
+
     def __init__(self, ai_factory: AiManagerFactory, logger, file_path: str, max_workers: int):
         """
         Initialize chunk embedding processor.
@@ -81,32 +85,86 @@ class EmbedProcessor:
                 progress_info.progress_manager.update_task(progress_info.parent_key, advance=1)
                 return chunk_index, chunk, None
 
+        def embed_batch(batch: List[Tuple[int, Any]]) -> Optional[List[Tuple[int, Any, Optional[List[float]]]]]:
+            first_index, last_index = batch[0][0], batch[-1][0]
+            try:
+                if verbose:
+                    self.logger.info(
+                        f"Processing chunks ({first_index + 1})–({last_index + 1}) / ({len(chunks)}) "
+                        f"of {format_file(self.file_path)}"
+                    )
+
+                for _, chunk in batch:
+                    assert chunk.reference_range != (0, 0), "Invalid chunk reference range (WTF, please report)"
+
+                # Create dedicated AI manager for this batch
+                ai_worker = self.ai_factory.get_ai()
+                _vectors = ai_worker.embed_batch(texts=[chunk.text for _, chunk in batch])
+            except AiProviderBatchRejectedError as e:
+                self.logger.warning(
+                    f"⚠️ Batch embedding of chunks ({first_index + 1})–({last_index + 1}) rejected, "
+                    f"embedding them one by one: {e}"
+                )
+                return None
+            except typer.Exit:
+                self.logger.critical(
+                    f"CHUNKS SKIPPED: Embedding chunks ({first_index + 1})–({last_index + 1}) / ({len(chunks)}) "
+                    f"of {format_file(self.file_path)} — all retries exhausted"
+                )
+                progress_info.progress_manager.update_task(progress_info.parent_key, advance=len(batch))
+                return [(chunk_index, chunk, None) for chunk_index, chunk in batch]
+            except Exception as e:
+                self.logger.error(f"Failed to embed chunks ({first_index + 1})–({last_index + 1}): {e}")
+                progress_info.progress_manager.update_task(progress_info.parent_key, advance=len(batch))
+                return [(chunk_index, chunk, None) for chunk_index, chunk in batch]
+
+            # Update progress after successful embedding
+            progress_info.progress_manager.update_task(progress_info.parent_key, advance=len(batch))
+
+            return [(chunk_index, chunk, _vector) for (chunk_index, chunk), _vector in zip(batch, _vectors)]
+
+        indexed_chunks = list(enumerate(chunks))
+
         # Use ThreadPoolExecutor for parallel embedding
         with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            future_to_batch = {}
+            future_to_chunk = {}
+
             # Submit all embedding tasks
-            future_to_chunk = {
-                executor.submit(embed_chunk, (chunk_index, chunk)): (chunk_index, chunk)
-                for chunk_index, chunk in enumerate(chunks)
-            }
+            if self.ai_factory.ai_provider_class.SUPPORTS_EMBED_BATCH:
+                for batch_start in range(0, len(indexed_chunks), EmbedProcessor.BATCH_SIZE):
+                    batch = indexed_chunks[batch_start:batch_start + EmbedProcessor.BATCH_SIZE]
+                    future_to_batch[executor.submit(embed_batch, batch)] = batch
+            else:
+                for chunk_data in indexed_chunks:
+                    future_to_chunk[executor.submit(embed_chunk, chunk_data)] = chunk_data
 
             # Collect results in original order
             results_dict = {}
+            for future in concurrent.futures.as_completed(future_to_batch):
+                batch = future_to_batch[future]
+                try:
+                    batch_results = future.result()
+                except Exception as exc:
+                    for chunk_index, original_chunk in batch:
+                        self.logger.error(f"Chunk ({chunk_index + 1}) generated an exception: {exc}")
+                        results_dict[chunk_index] = (original_chunk, None)
+                    continue
+
+                if batch_results is None:
+                    # Batch rejected: embed its chunks in parallel, one task per chunk
+                    for chunk_data in batch:
+                        future_to_chunk[executor.submit(embed_chunk, chunk_data)] = chunk_data
+                    continue
+
+                for result_index, chunk, vector in batch_results:
+                    results_dict[result_index] = (chunk, vector)
+
             for future in concurrent.futures.as_completed(future_to_chunk):
                 chunk_index, original_chunk = future_to_chunk[future]
                 try:
                     result_index, chunk, vector = future.result()
                     results_dict[result_index] = (chunk, vector)
-                except typer.Exit:
-                    text_preview = original_chunk.text[:200] + "..." if len(original_chunk.text) > 200 else original_chunk.text
-                    self.logger.critical(
-                        f"CHUNK SKIPPED: Embedding chunk ({chunk_index + 1}) / ({len(chunks)}) "
-                        f"of {format_file(self.file_path)} — all retries exhausted\n"
-                        f"Chunk text ({len(original_chunk.text)} chars): {text_preview}"
-                    )
-                    results_dict[chunk_index] = (original_chunk, None)
-                except AiProviderMaxTokensError as exc:
-                    self.logger.warning(f"Chunk ({chunk_index + 1}) skipped — max tokens exceeded: {exc}")
-                    results_dict[chunk_index] = (original_chunk, None)
                 except Exception as exc:
                     self.logger.error(f"Chunk ({chunk_index + 1}) generated an exception: {exc}")
                     results_dict[chunk_index] = (original_chunk, None)
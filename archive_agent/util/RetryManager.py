@@ -2,6 +2,7 @@
 #  This file is part of Archive Agent. See LICENSE for details.
 
 import asyncio
+import random
 import typer
 import time
 import requests
@@ -10,7 +11,7 @@ import logging
 from typing import Callable, Optional, Any, Dict, NoReturn
 
 from archive_agent.ai_provider.AiProviderError import AiProviderError
-from archive_agent.ai_provider.AiProviderError import AiProviderMaxTokensError
+from archive_agent.ai_provider.AiProviderError import AiProviderMaxTokensError, AiProviderBatchRejectedError
 
 from openai import OpenAIError
 
@@ -53,6 +54,9 @@ class RetryManager:
         requests.exceptions.RequestException,
     )
 
+    # Fraction by which each backoff delay is randomly shortened (0.0 disables jitter).
+    BACKOFF_JITTER = 0.25
+
     def __init__(
             self,
             predelay: float = 0,
@@ -97,12 +101,21 @@ class RetryManager:
             logger.debug(f"Waiting for {self.predelay} seconds (fixed predelay) …")
             time.sleep(self.predelay)
 
+    def _get_jittered_delay(self) -> float:
+        """
+        Get the current backoff delay, shortened by a random fraction of up to `BACKOFF_JITTER`.
+        Parallel workers that fail together (e.g. on a rate limit) thus do not all retry at the same moment.
+        :return: Delay (in seconds).
+        """
+        return self.backoff_delay * (1.0 - random.uniform(0.0, RetryManager.BACKOFF_JITTER))
+
     def apply_delay(self) -> None:
         """
-        Apply exponential backoff delay between attempts.
+        Apply exponential backoff delay (with jitter) between attempts.
         """
-        logger.warning(f"Waiting for {self.backoff_delay} seconds (exponential backoff) …")
-        time.sleep(self.backoff_delay)
+        delay = self._get_jittered_delay()
+        logger.warning(f"Waiting for {delay:.1f} seconds (exponential backoff) …")
+        time.sleep(delay)
         self.backoff_delay = min(self.backoff_delay * self.backoff_exponent, self.delay_max)
         self.fail_budget -= 1
 
@@ -116,10 +129,11 @@ class RetryManager:
 
     async def apply_delay_async(self) -> None:
         """
-        Apply exponential backoff delay between attempts asynchronously.
+        Apply exponential backoff delay (with jitter) between attempts asynchronously.
         """
-        logger.warning(f"Waiting for {self.backoff_delay} seconds (exponential backoff) …")
-        await asyncio.sleep(self.backoff_delay)
+        delay = self._get_jittered_delay()
+        logger.warning(f"Waiting for {delay:.1f} seconds (exponential backoff) …")
+        await asyncio.sleep(delay)
         self.backoff_delay = min(self.backoff_delay * self.backoff_exponent, self.delay_max)
         self.fail_budget -= 1
 
@@ -173,7 +187,7 @@ class RetryManager:
                 self._log_retry_attempt(e)
                 self.apply_delay()
 
-            except AiProviderMaxTokensError:
+            except (AiProviderMaxTokensError, AiProviderBatchRejectedError):
                 raise  # Non-retryable but not fatal — let callers handle gracefully
 
             except Exception as e:
@@ -208,7 +222,7 @@ class RetryManager:
                 self._log_retry_attempt(e)
                 await self.apply_delay_async()
 
-            except AiProviderMaxTokensError:
+            except (AiProviderMaxTokensError, AiProviderBatchRejectedError):
                 raise  # Non-retryable but not fatal — let callers handle gracefully
 
             except Exception as e:
@@ -1,4 +1,325 @@
 #  Copyright © 2025 Dr.-Ing. Paul Wilhelm <paul@wilhelm.dev>
 #  This file is part of Archive Agent. See LICENSE for details.
 
-# TODO
+"""
+Unit tests for request handling in archive_agent.ai_provider.AiProvider.
+
+These tests validate:
+- Concurrent identical requests share one provider call (leader/followers)
+- If the leader fails, a single follower retries the request while the others keep waiting
+- With `--nocache`, identical requests are not serialized behind each other
+- Batch embeddings only send cache misses, once per unique text, and share cache entries with single embeddings
+- The OpenAI SDK batch helper keeps input order, counts tokens once, and maps rejected batches to a non-retryable error
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, List, Optional, cast
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+from openai import BadRequestError, OpenAI
+
+from archive_agent.ai.AiResult import AiResult
+from archive_agent.ai_provider.AiProvider import AiProvider
+from archive_agent.ai_provider.AiProviderError import AiProviderError, AiProviderBatchRejectedError
+from archive_agent.ai_provider.AiProviderParams import AiProviderParams
+from archive_agent.core.CacheManager import CacheManager
+
+
+class _FakeProvider(AiProvider):
+    """
+    Provider whose embed callbacks are injected by the test; all other callbacks are unused.
+    """
+
+    def __init__(
+            self,
+            cache: CacheManager,
+            invalidate_cache: bool,
+            perform_embed: Callable[[str], AiResult],
+            perform_embed_batch: Optional[Callable[[List[str]], List[AiResult]]] = None,
+    ):
+        AiProvider.__init__(
+            self,
+            logger=MagicMock(),
+            cache=cache,
+            invalidate_cache=invalidate_cache,
+            params=AiProviderParams(
+                model_chunk="chunk",
+                model_embed="embed",
+                model_rerank="rerank",
+                model_query="query",
+                model_vision="",
+                temperature_query=0.0,
+            ),
+            server_url="http://localhost",
+        )
+        self.perform_embed = perform_embed
+        self.perform_embed_batch = perform_embed_batch
+
+    def _perform_chunk_callback(self, prompt) -> AiResult:
+        raise NotImplementedError
+
+    def _perform_embed_callback(self, text: str) -> AiResult:
+        return self.perform_embed(text)
+
+    def _perform_embed_batch_callback(self, texts: List[str]) -> List[AiResult]:
+        if self.perform_embed_batch is None:
+            return AiProvider._perform_embed_batch_callback(self, texts)
+        return self.perform_embed_batch(texts)
+
+    def _perform_rerank_callback(self, prompt: str) -> AiResult:
+        raise NotImplementedError
+
+    def _perform_query_callback(self, prompt: str) -> AiResult:
+        raise NotImplementedError
+
+    def _perform_vision_callback(self, prompt: str, image_base64: str) -> AiResult:
+        raise NotImplementedError
+
+
+def _run_workers(
+        cache: CacheManager,
+        invalidate_cache: bool,
+        perform_embed: Callable[[str], AiResult],
+        num_workers: int,
+) -> tuple[List[AiResult], List[Exception]]:
+    """
+    Embed the same text from several threads, each with its own provider instance (as in ingestion).
+
+    :returns: Results and exceptions collected from all workers.
+    """
+    results: List[AiResult] = []
+    errors: List[Exception] = []
+    lock = threading.Lock()
+
+    def worker() -> None:
+        provider = _FakeProvider(cache=cache, invalidate_cache=invalidate_cache, perform_embed=perform_embed)
+        try:
+            result = provider.embed_callback(text="same text")
+            with lock:
+                results.append(result)
+        except Exception as e:
+            with lock:
+                errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(num_workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+        assert not t.is_alive(), "Worker hung"
+
+    return results, errors
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> CacheManager:
+    return CacheManager(cli=MagicMock(), cache_path=tmp_path / "cache")
+
+
+@pytest.fixture
+def nocache(tmp_path: Path) -> CacheManager:
+    return CacheManager(cli=MagicMock(), cache_path=tmp_path / "nocache", invalidate_cache=True)
+
+
+def test_concurrent_identical_requests_share_one_call(cache: CacheManager) -> None:
+    """
+    Only the leader calls the provider; followers wait and read its result from the cache.
+    """
+    calls = []
+
+    def perform_embed(text: str) -> AiResult:
+        calls.append(text)
+        time.sleep(0.2)  # Keep the request in flight while the followers arrive
+        return AiResult(total_tokens=7, embedding=[1.0, 2.0])
+
+    results, errors = _run_workers(cache, invalidate_cache=False, perform_embed=perform_embed, num_workers=5)
+
+    assert errors == []
+    assert len(calls) == 1
+    assert len(results) == 5
+    assert all(r.embedding == [1.0, 2.0] for r in results)
+    assert sorted(r.total_tokens for r in results) == [0, 0, 0, 0, 7]  # Only the leader consumed tokens
+    assert AiProvider._inflight == {}
+
+
+def test_followers_retry_when_leader_fails(cache: CacheManager) -> None:
+    """
+    If the leader's request fails, one follower takes over as the new leader; the others wait for its result.
+    """
+    calls = []
+    calls_lock = threading.Lock()
+
+    def perform_embed(text: str) -> AiResult:
+        with calls_lock:
+            calls.append(text)
+            is_first = len(calls) == 1
+        time.sleep(0.2)  # Keep the request in flight while the followers arrive
+        if is_first:
+            raise AiProviderError("Leader failed")
+        return AiResult(total_tokens=7, embedding=[1.0, 2.0])
+
+    results, errors = _run_workers(cache, invalidate_cache=False, perform_embed=perform_embed, num_workers=4)
+
+    assert len(errors) == 1 and isinstance(errors[0], AiProviderError)
+    assert len(results) == 3
+    assert all(r.embedding == [1.0, 2.0] for r in results)
+    assert len(calls) == 2  # The failed request and a single retry, not one retry per follower
+    assert sorted(r.total_tokens for r in results) == [0, 0, 7]
+    assert AiProvider._inflight == {}
+
+
+def test_nocache_requests_run_in_parallel(nocache: CacheManager) -> None:
+    """
+    With `--nocache`, followers could never read the leader's result, so requests must not wait for each other.
+    """
+    num_workers = 3
+    # Every request blocks until all of them are in flight at once; serialized requests would break the barrier
+    barrier = threading.Barrier(num_workers, timeout=5)
+
+    def perform_embed(text: str) -> AiResult:
+        barrier.wait()
+        return AiResult(total_tokens=7, embedding=[1.0, 2.0])
+
+    results, errors = _run_workers(nocache, invalidate_cache=True, perform_embed=perform_embed, num_workers=num_workers)
+
+    assert errors == []
+    assert len(results) == num_workers
+    assert all(r.total_tokens == 7 for r in results)
+    assert AiProvider._inflight == {}
+
+
+def _embed_text(text: str) -> AiResult:
+    """
+    Deterministic fake embedding: one token per character.
+    """
+    return AiResult(total_tokens=len(text), embedding=[float(len(text))])
+
+
+def test_embed_batch_sends_only_unique_cache_misses(cache: CacheManager) -> None:
+    """
+    Cached texts are served from the cache, and duplicate misses are sent once and fanned out without tokens.
+    """
+    batches: List[List[str]] = []
+
+    def perform_embed_batch(texts: List[str]) -> List[AiResult]:
+        batches.append(list(texts))
+        return [_embed_text(text) for text in texts]
+
+    provider = _FakeProvider(cache=cache, invalidate_cache=False, perform_embed=_embed_text, perform_embed_batch=perform_embed_batch)
+
+    provider.embed_callback(text="a")  # Cached via the single-text path
+
+    results = provider.embed_batch_callback(texts=["a", "bb", "bb", "ccc"])
+
+    assert batches == [["bb", "ccc"]]
+    assert [r.embedding for r in results] == [[1.0], [2.0], [2.0], [3.0]]
+    assert [r.total_tokens for r in results] == [0, 2, 0, 3]
+
+    # Batched results are cached under the single-text keys
+    def fail(text: str) -> AiResult:
+        raise AssertionError(f"Unexpected provider call for {text!r}")
+
+    provider.perform_embed = fail
+    assert provider.embed_callback(text="ccc").embedding == [3.0]
+
+
+def test_embed_batch_all_cached_sends_nothing(cache: CacheManager) -> None:
+    """
+    If every text is cached, no batch request is made.
+    """
+    def perform_embed_batch(texts: List[str]) -> List[AiResult]:
+        raise AssertionError("Unexpected batch request")
+
+    provider = _FakeProvider(cache=cache, invalidate_cache=False, perform_embed=_embed_text, perform_embed_batch=perform_embed_batch)
+    provider.embed_callback(text="a")
+
+    results = provider.embed_batch_callback(texts=["a", "a"])
+
+    assert [r.embedding for r in results] == [[1.0], [1.0]]
+    assert [r.total_tokens for r in results] == [0, 0]
+
+
+def test_embed_batch_length_mismatch_raises(cache: CacheManager) -> None:
+    """
+    A provider returning the wrong number of results is an error, and nothing is cached.
+    """
+    provider = _FakeProvider(
+        cache=cache,
+        invalidate_cache=False,
+        perform_embed=_embed_text,
+        perform_embed_batch=lambda texts: [_embed_text(texts[0])],
+    )
+
+    with pytest.raises(AiProviderError, match="returned 1 results for 2 texts"):
+        provider.embed_batch_callback(texts=["a", "bb"])
+
+    assert cache.get(key=provider._get_cache_key("embed_callback", dict(text="a")), display_key="") is None
+
+
+def test_embed_batch_default_embeds_one_by_one(cache: CacheManager) -> None:
+    """
+    Providers without a batch endpoint fall back to the single-text callback.
+    """
+    provider = _FakeProvider(cache=cache, invalidate_cache=False, perform_embed=_embed_text)
+
+    results = provider.embed_batch_callback(texts=["a", "bb"])
+
+    assert [r.embedding for r in results] == [[1.0], [2.0]]
+    assert [r.total_tokens for r in results] == [1, 2]
+
+
+def _fake_openai_client(create: Callable[..., object]) -> OpenAI:
+    """
+    Minimal stand-in for an OpenAI SDK client exposing only `embeddings.create`.
+    """
+    return cast(OpenAI, SimpleNamespace(embeddings=SimpleNamespace(create=create)))
+
+
+def test_openai_embed_batch_orders_by_index_and_counts_tokens_once(cache: CacheManager) -> None:
+    """
+    Embeddings are returned in input order, and the request's token usage is attributed to the first result.
+    """
+    def create(input: List[str], model: str) -> SimpleNamespace:
+        assert model == "embed"
+        data = [SimpleNamespace(index=index, embedding=[float(len(text))]) for index, text in enumerate(input)]
+        return SimpleNamespace(data=list(reversed(data)), usage=SimpleNamespace(total_tokens=42))
+
+    provider = _FakeProvider(cache=cache, invalidate_cache=False, perform_embed=_embed_text)
+
+    results = provider._perform_openai_embed_batch(client=_fake_openai_client(create), texts=["a", "bb", "ccc"])
+
+    assert [r.embedding for r in results] == [[1.0], [2.0], [3.0]]
+    assert [r.total_tokens for r in results] == [42, 0, 0]
+
+
+def test_openai_embed_batch_errors(cache: CacheManager) -> None:
+    """
+    Bad requests are non-retryable batch rejections; other failures and short responses are retryable provider errors.
+    """
+    provider = _FakeProvider(cache=cache, invalidate_cache=False, perform_embed=_embed_text)
+
+    def create_bad_request(input: List[str], model: str) -> SimpleNamespace:
+        response = httpx.Response(400, request=httpx.Request("POST", "http://localhost/embeddings"))
+        raise BadRequestError("maximum context length exceeded", response=response, body=None)
+
+    with pytest.raises(AiProviderBatchRejectedError):
+        provider._perform_openai_embed_batch(client=_fake_openai_client(create_bad_request), texts=["a"])
+
+    def create_timeout(input: List[str], model: str) -> SimpleNamespace:
+        raise httpx.ReadTimeout("timeout")
+
+    with pytest.raises(AiProviderError):
+        provider._perform_openai_embed_batch(client=_fake_openai_client(create_timeout), texts=["a"])
+
+    def create_short(input: List[str], model: str) -> SimpleNamespace:
+        return SimpleNamespace(data=[SimpleNamespace(index=0, embedding=[1.0])], usage=None)
+
+    with pytest.raises(AiProviderError, match="returned 1 embeddings for 2 texts"):
+        provider._perform_openai_embed_batch(client=_fake_openai_client(create_short), texts=["a", "bb"])
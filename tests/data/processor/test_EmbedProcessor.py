@@ -1,4 +1,108 @@
 #  Copyright © 2025 Dr.-Ing. Paul Wilhelm <paul@wilhelm.dev>
 #  This file is part of Archive Agent. See LICENSE for details.
 
-# TODO
+"""
+Unit tests for archive_agent.data.processor.EmbedProcessor.
+
+These tests validate:
+- Providers without a batch endpoint embed one chunk per task, in parallel
+- Providers with a batch endpoint embed chunks in batches of `BATCH_SIZE`
+- A rejected batch falls back to per-chunk embedding, in parallel
+- A batch that exhausts all retries yields no vectors for its chunks
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, List, cast
+from unittest.mock import MagicMock
+
+import typer
+
+from archive_agent.ai.AiManagerFactory import AiManagerFactory
+from archive_agent.ai_provider.AiProviderError import AiProviderBatchRejectedError
+from archive_agent.core.ProgressManager import ProgressInfo
+from archive_agent.data.processor.EmbedProcessor import EmbedProcessor
+
+_NUM_CHUNKS = 40
+_MAX_WORKERS = 4
+
+
+class _FakeAi:
+    """
+    Fake AI manager recording its calls; vectors encode the text length.
+    """
+
+    def __init__(self, calls: List[Any], batch_error: Exception | None) -> None:
+        self.calls = calls
+        self.batch_error = batch_error
+
+    def embed(self, text: str) -> List[float]:
+        self.calls.append(("embed", threading.get_ident()))
+        time.sleep(0.02)  # Give other workers a chance to pick up tasks
+        return [float(len(text))]
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        self.calls.append(("embed_batch", len(texts)))
+        if self.batch_error is not None:
+            raise self.batch_error
+        return [[float(len(text))] for text in texts]
+
+
+def _run(supports_embed_batch: bool, batch_error: Exception | None = None) -> tuple[List[Any], List[Any]]:
+    """
+    Embed `_NUM_CHUNKS` chunks with a fake AI factory.
+
+    :returns: Vectors in chunk order, and the recorded AI calls.
+    """
+    calls: List[Any] = []
+    ai_factory = cast(AiManagerFactory, SimpleNamespace(
+        ai_provider_class=SimpleNamespace(SUPPORTS_EMBED_BATCH=supports_embed_batch),
+        get_ai=lambda: _FakeAi(calls, batch_error),
+    ))
+    processor = EmbedProcessor(ai_factory=ai_factory, logger=MagicMock(), file_path="file.txt", max_workers=_MAX_WORKERS)
+    chunks = [SimpleNamespace(text="x" * length, reference_range=(1, 1)) for length in range(1, _NUM_CHUNKS + 1)]
+    progress_info = cast(ProgressInfo, SimpleNamespace(progress_manager=MagicMock(), parent_key="parent"))
+
+    results = processor.process_chunks_parallel(chunks=chunks, verbose=False, progress_info=progress_info)
+
+    assert [chunk for chunk, _ in results] == chunks
+    return [vector for _, vector in results], calls
+
+
+def _expected_vectors() -> List[List[float]]:
+    return [[float(length)] for length in range(1, _NUM_CHUNKS + 1)]
+
+
+def test_without_batch_endpoint_embeds_chunks_in_parallel() -> None:
+    vectors, calls = _run(supports_embed_batch=False)
+
+    assert vectors == _expected_vectors()
+    assert all(kind == "embed" for kind, _ in calls)
+    assert len(calls) == _NUM_CHUNKS
+    assert len({thread for _, thread in calls}) > 1
+
+
+def test_with_batch_endpoint_embeds_in_batches() -> None:
+    vectors, calls = _run(supports_embed_batch=True)
+
+    assert vectors == _expected_vectors()
+    assert sorted(calls) == [("embed_batch", _NUM_CHUNKS - EmbedProcessor.BATCH_SIZE), ("embed_batch", EmbedProcessor.BATCH_SIZE)]
+
+
+def test_rejected_batch_falls_back_to_parallel_chunks() -> None:
+    vectors, calls = _run(supports_embed_batch=True, batch_error=AiProviderBatchRejectedError("context length exceeded"))
+
+    assert vectors == _expected_vectors()
+    embed_calls = [thread for kind, thread in calls if kind == "embed"]
+    assert len(embed_calls) == _NUM_CHUNKS
+    assert len(set(embed_calls)) > 1
+
+
+def test_exhausted_batch_skips_chunks_without_fallback() -> None:
+    vectors, calls = _run(supports_embed_batch=True, batch_error=typer.Exit(code=1))
+
+    assert vectors == [None] * _NUM_CHUNKS
+    assert all(kind == "embed_batch" for kind, _ in calls)
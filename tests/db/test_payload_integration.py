@@ -3,6 +3,7 @@
 #  This file is part of Archive Agent. See LICENSE for details.
 
 import logging
+from typing import List, cast
 
 from unittest.mock import Mock
 from qdrant_client.models import ScoredPoint
@@ -333,6 +334,44 @@ class TestPayloadIntegrationAiQuery:
         assert "<<<" in context  # Hash separator format
         assert ">>>" in context
 
+    def test_index_points_matches_point_hashes(self):
+        """Test AiQuery.index_points builds context and hash mapping consistent with get_point_hash."""
+        payload1 = {
+            "file_path": "/home/user/doc1.txt",
+            "file_mtime": 1640995200.0,
+            "chunk_index": 0,
+            "chunks_total": 2,
+            "chunk_text": "First chunk content.",
+            "version": "v1.0.0",
+            "page_range": None,
+            "line_range": [1, 5]
+        }
+
+        payload2 = {
+            "file_path": "/home/user/doc2.txt",
+            "file_mtime": 1640995200.0,
+            "chunk_index": 1,
+            "chunks_total": 3,
+            "chunk_text": "Second chunk content.",
+            "version": "v1.0.0",
+            "page_range": [2, 3],
+            "line_range": None
+        }
+        point1 = self.create_mock_point(payload1)
+        point2 = self.create_mock_point(payload2)
+        points = cast(List[ScoredPoint], [point1, point2])  # Mock objects for testing
+        context, points_by_hash = AiQuery.index_points(points)
+
+        hash1 = AiQuery.get_point_hash(point1)
+        hash2 = AiQuery.get_point_hash(point2)
+        assert points_by_hash == {hash1: point1, hash2: point2}
+        assert context == AiQuery.get_context_from_points(points)
+        assert context == (
+            f"<<< {hash1} >>>\n\nFirst chunk content.\n"
+            "\n\n\n\n"
+            f"<<< {hash2} >>>\n\nSecond chunk content.\n"
+        )
+
 
 class TestPayloadIntegrationBackwardCompatibility:
     """Test backward compatibility with legacy payloads across the system."""